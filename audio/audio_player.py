@@ -2,27 +2,43 @@ import pyaudio
 import wave
 import time
 import threading
-import queue
 import os
 
 
 class RealTimeWavPlayer:
     """
     A class for playing WAV chunks in real-time
+
+    Args:
+        chunk_size (int): Number of frames per chunk and per PortAudio buffer
+        buffer_chunks (int): Number of chunks that can be buffered ahead of
+                             playback. Each chunk adds chunk_size / sample_rate
+                             seconds of latency, fewer chunks make buffer
+                             underruns more likely if the producer stalls.
     """
 
-    def __init__(self, chunk_size=1024):
+    def __init__(self, chunk_size=1024, buffer_chunks=2):
         self.chunk_size = chunk_size
         self.p = pyaudio.PyAudio()
         self.stream = None
-        self.audio_queue = queue.Queue(maxsize=100)
+        self.buffer_chunks = buffer_chunks
         self.is_playing = False
-        self.play_thread = None
         self.sample_width = None
         self.channels = None
         self.sample_rate = None
         self.format = None
 
+        # Ring buffer of raw frames shared with the PortAudio callback.
+        # Read/write positions only ever grow. With a single producer and a
+        # single consumer each side owns one position and may read the other
+        # without locking, the condition only lets add_chunk wait for the
+        # callback to free space.
+        self._ring = None
+        self._ring_cond = threading.Condition()
+        self._read_pos = 0
+        self._write_pos = 0
+        self._frame_size = None
+
     def set_audio_format(self, sample_width, channels, sample_rate):
         """Set the audio format parameters"""
         self.sample_width = sample_width
@@ -38,6 +54,12 @@ class RealTimeWavPlayer:
         }
         self.format = format_mapping.get(sample_width, pyaudio.paInt16)
 
+        # Allocate the ring buffer now that the frame size is known
+        self._frame_size = sample_width * channels
+        self._ring = bytearray(self.buffer_chunks * self.chunk_size * self._frame_size)
+        self._read_pos = 0
+        self._write_pos = 0
+
     def extract_wav_info(self, wav_file):
         """Extract audio format information from a WAV file"""
         with wave.open(wav_file, "rb") as wf:
@@ -46,38 +68,35 @@ class RealTimeWavPlayer:
             )
             return wf.getsampwidth(), wf.getnchannels(), wf.getframerate()
 
-    def _play_worker(self):
-        """Worker thread that plays audio chunks from the queue"""
-        self.stream = self.p.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.sample_rate,
-            output=True,
-            frames_per_buffer=self.chunk_size,
-        )
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback that copies buffered frames to the output"""
+        nbytes = frame_count * self._frame_size
+        capacity = len(self._ring)
 
-        self.stream.start_stream()
+        read_pos = self._read_pos
+        available = self._write_pos - read_pos
 
-        while self.is_playing:
-            try:
-                chunk = self.audio_queue.get(timeout=0.5)
-                if chunk is None:  # None is the signal to stop
-                    break
-                self.stream.write(chunk)
-                self.audio_queue.task_done()
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Error playing audio: {e}")
-                break
+        n = min(nbytes, available)
+        start = read_pos % capacity
+        end = start + n
+        ring = memoryview(self._ring)
+        if end <= capacity:
+            data = bytes(ring[start:end])
+        else:
+            data = bytes(ring[start:]) + bytes(ring[: end - capacity])
 
-        self.stream.stop_stream()
-        self.stream.close()
-        self.stream = None
-        self.is_playing = False
+        with self._ring_cond:
+            self._read_pos = read_pos + n
+            self._ring_cond.notify()
+
+        # Pad with silence on buffer underrun
+        if n < nbytes:
+            data += b"\x00" * (nbytes - n)
+
+        return data, pyaudio.paContinue
 
     def start(self):
-        """Start the audio playback thread"""
+        """Start the audio playback stream"""
         if self.is_playing:
             return
 
@@ -86,20 +105,75 @@ class RealTimeWavPlayer:
                 "Audio format not set. Call set_audio_format() or extract_wav_info() first."
             )
 
+        # Drop anything a producer wrote while playback was stopped
+        with self._ring_cond:
+            self._read_pos = self._write_pos
+
         self.is_playing = True
-        self.play_thread = threading.Thread(target=self._play_worker)
-        self.play_thread.daemon = True
-        self.play_thread.start()
+        self.stream = self.p.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.sample_rate,
+            output=True,
+            frames_per_buffer=self.chunk_size,
+            stream_callback=self._pa_callback,
+        )
+        self.stream.start_stream()
 
-    def add_chunk(self, chunk):
-        """Add an audio chunk to the playback queue"""
-        if self.is_playing:
-            try:
-                self.audio_queue.put(chunk, block=False)
-                return True
-            except queue.Full:
+    def _write_ring(self, data, timeout):
+        """Copy data, at most the buffer capacity, into the ring buffer once
+        there is room for it"""
+        n = len(data)
+        capacity = len(self._ring)
+
+        write_pos = self._write_pos
+        if capacity - (write_pos - self._read_pos) < n:
+            with self._ring_cond:
+                # stop() notifies waiters, so also wake when playback stops
+                self._ring_cond.wait_for(
+                    lambda: not self.is_playing
+                    or capacity - (write_pos - self._read_pos) >= n,
+                    timeout,
+                )
+                if not self.is_playing or capacity - (write_pos - self._read_pos) < n:
+                    return False
+
+        start = write_pos % capacity
+        end = start + n
+        ring = memoryview(self._ring)
+        if end <= capacity:
+            ring[start:end] = data
+        else:
+            split = capacity - start
+            ring[start:] = data[:split]
+            ring[: end - capacity] = data[split:]
+
+        self._write_pos = write_pos + n
+        return True
+
+    def add_chunk(self, chunk, timeout=None):
+        """Add an audio chunk to the playback buffer
+
+        Blocks until there is room in the buffer, for at most timeout seconds
+        (by default one and a half times the playback time of a full buffer,
+        enough for playback to drain it). This paces the producer to the
+        playback rate. Chunks larger than the buffer are written in
+        buffer-sized pieces, each waiting for room in turn. Returns False if
+        the chunk could not be buffered in time, in which case any remaining
+        pieces are dropped.
+        """
+        if not self.is_playing:
+            return False
+
+        if timeout is None:
+            timeout = self.buffer_chunks * self.chunk_size / self.sample_rate * 1.5
+
+        data = memoryview(chunk).cast("B")
+        capacity = len(self._ring)
+        for start in range(0, len(data), capacity):
+            if not self._write_ring(data[start : start + capacity], timeout):
                 return False
-        return False
+        return True
 
     def stop(self):
         """Stop the audio playback"""
@@ -107,17 +181,14 @@ class RealTimeWavPlayer:
             return
 
         self.is_playing = False
-        self.audio_queue.put(None)  # Signal to stop
-        if self.play_thread:
-            self.play_thread.join(timeout=1.0)
-
-        # Clear the queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-                self.audio_queue.task_done()
-            except queue.Empty:
-                break
+        self.stream.stop_stream()
+        self.stream.close()
+        self.stream = None
+
+        # Discard any buffered frames
+        with self._ring_cond:
+            self._read_pos = self._write_pos
+            self._ring_cond.notify_all()
 
     def close(self):
         """Clean up resources"""
@@ -138,9 +209,10 @@ def example_play_from_file(wav_file):
     with wave.open(wav_file, "rb") as wf:
         chunk = wf.readframes(player.chunk_size)
         while chunk:
-            # Simulate real-time processing by adding small delays
-            time.sleep(0.01)  # Adjust this value to simulate different processing times
-            player.add_chunk(chunk)
+            # add_chunk blocks while the buffer is full, pacing the reads.
+            # Retry until the chunk is accepted so none of it is dropped.
+            while not player.add_chunk(chunk) and player.is_playing:
+                pass
             chunk = wf.readframes(player.chunk_size)
 
     # Wait for all chunks to be played
@@ -169,14 +241,25 @@ def example_generate_and_play():
     chunk_duration = player.chunk_size / sample_rate
     num_chunks = int(duration / chunk_duration)
 
-    for i in range(num_chunks):
-        t = np.arange(i * player.chunk_size, (i + 1) * player.chunk_size) / sample_rate
-        tone = (np.sin(2 * np.pi * tone_freq * t) * 32767).astype(np.int16)
-        chunk = tone.tobytes()
-        player.add_chunk(chunk)
-        time.sleep(
-            chunk_duration * 0.8
-        )  # Slightly shorter than real-time to avoid buffer underruns
+    # Buffers reused for every chunk, only the phase changes between chunks
+    t = np.arange(player.chunk_size, dtype=np.float32) / sample_rate
+    scratch_f = np.empty(player.chunk_size, dtype=np.float32)
+    scratch = np.empty(player.chunk_size, dtype=np.int16)
+    phase = 0.0
+    phase_step = 2 * np.pi * tone_freq * chunk_duration
+
+    # add_chunk blocks while the buffer is full, so generation runs at the
+    # playback rate without manual sleeps. Chunks are retried until accepted.
+    for _ in range(num_chunks):
+        np.multiply(t, 2 * np.pi * tone_freq, out=scratch_f)
+        np.add(scratch_f, phase, out=scratch_f)
+        np.sin(scratch_f, out=scratch_f)
+        np.multiply(scratch_f, 32767.0, out=scratch_f)
+        scratch[:] = scratch_f
+        chunk = scratch.tobytes()
+        while not player.add_chunk(chunk) and player.is_playing:
+            pass
+        phase = (phase + phase_step) % (2 * np.pi)
 
     time.sleep(0.5)
     player.stop()
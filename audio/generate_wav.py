@@ -5,9 +5,81 @@ A simple script for generating sine wave chunks and saving them to WAV files.
 import wave
 import numpy as np
 
+_TWO_PI = 2 * np.pi
+
+# Maximum number of samples the chunk generator computes in one go
+_SLAB_SAMPLES = 1 << 20
+
+# Sine lookup table for the fast approximate generation path
+_SINE_LUT_SIZE = 4096
+_SINE_LUT = np.sin(np.linspace(0, _TWO_PI, _SINE_LUT_SIZE, endpoint=False)).astype(
+    np.float32
+)
+
+
+def _lut_sin(x):
+    """
+    Approximate np.sin for non-negative angles with a table lookup
+
+    Args:
+        x (numpy.ndarray): Angles in radians
+
+    Returns:
+        numpy.ndarray: Sine of the angles, nearest of 4096 table entries
+    """
+    idx = (x * (_SINE_LUT_SIZE / _TWO_PI) + 0.5).astype(np.intp)
+    return _SINE_LUT[idx & (_SINE_LUT_SIZE - 1)]
+
+
+def _to_pcm(samples, scale, out):
+    """
+    Scale float samples to integer PCM in a single pass, truncating toward
+    zero like astype does
+
+    Args:
+        samples (numpy.ndarray): Float samples, scaled values must fit in out
+        scale (float): Factor applied before the conversion
+        out (numpy.ndarray): Integer array with as many elements to write into
+
+    Returns:
+        numpy.ndarray: out
+    """
+    if out.size != samples.size:
+        raise ValueError("out must have as many elements as samples")
+
+    np.multiply(samples, scale, out=out.reshape(samples.shape), casting="unsafe")
+    return out
+
+
+def _scale_samples(samples, amplitude, output_dtype):
+    """
+    Scale unit sine samples and convert them to the output type
+
+    Args:
+        samples (numpy.ndarray): Float samples in [-1.0, 1.0], float output
+                                 is scaled in place
+        amplitude (float): Amplitude of the sine wave (0.0 to 1.0)
+        output_dtype (numpy.dtype): Float type, or integer PCM type to scale
+                                    to the full range of
+
+    Returns:
+        numpy.ndarray: Scaled samples of output_dtype
+    """
+    output_dtype = np.dtype(output_dtype)
+    if np.issubdtype(output_dtype, np.integer):
+        out = np.empty(samples.shape, dtype=output_dtype)
+        return _to_pcm(samples, amplitude * np.iinfo(output_dtype).max, out)
+
+    np.multiply(samples, amplitude, out=samples)
+    return samples.astype(output_dtype, copy=False)
+
 
 def generate_sine_chunk(
-    frequency, chunk_duration, sample_rate=44100, amplitude=0.5, phase_offset=0
+    frequency,
+    chunk_duration,
+    sample_rate=44100,
+    amplitude=0.5,
+    phase_offset=0,
 ):
     """
     Generate a sine wave chunk as a numpy array
@@ -31,12 +103,10 @@ def generate_sine_chunk(
     t = np.linspace(0, chunk_duration, num_samples, False)
 
     # Generate sine wave with phase continuity
-    sine_wave = amplitude * np.sin(2 * np.pi * frequency * t + phase_offset)
+    sine_wave = amplitude * np.sin(_TWO_PI * frequency * t + phase_offset)
 
     # Calculate phase offset for the next chunk to ensure continuity
-    next_phase_offset = (phase_offset + 2 * np.pi * frequency * chunk_duration) % (
-        2 * np.pi
-    )
+    next_phase_offset = (phase_offset + _TWO_PI * frequency * chunk_duration) % _TWO_PI
 
     return sine_wave, next_phase_offset
 
@@ -47,6 +117,8 @@ def sine_wave_chunk_generator(
     num_chunks=None,
     sample_rate=44100,
     amplitude=0.5,
+    use_lut=False,
+    output_dtype=np.float64,
 ):
     """
     Generator that yields sine wave chunks
@@ -59,27 +131,53 @@ def sine_wave_chunk_generator(
                                     infinite
         sample_rate (int): Sample rate in Hz
         amplitude (float): Amplitude of the sine wave (0.0 to 1.0)
+        use_lut (bool): Use a sine lookup table instead of np.sin. Much
+                        faster, but only accurate to about 1e-3.
+        output_dtype (numpy.dtype): Sample type, np.int16 yields 16-bit PCM
+                                    ready to be written without conversion
 
     Yields:
         numpy.ndarray: Chunk of sine wave samples
     """
+    # Bind the per-chunk helpers to locals once, outside the loop
+    sin = _lut_sin if use_lut else np.sin
+    scale_samples = _scale_samples
+    two_pi = _TWO_PI
+    num_samples = int(chunk_duration * sample_rate)
+
+    # A constant frequency is computed a slab of chunks per sine call, with
+    # a bounded number of samples so memory use doesn't grow with num_chunks.
+    # A frequency function is only called once its chunk is requested.
+    if callable(frequency):
+        slab_chunks = 1
+    else:
+        slab_chunks = max(1, _SLAB_SAMPLES // max(num_samples, 1))
+
+    # Time values are the same for every chunk, only the phase changes
+    t_chunk = np.arange(num_samples) / sample_rate
     phase_offset = 0
     chunk_index = 0
+    omega = None if callable(frequency) else two_pi * frequency
 
     while num_chunks is None or chunk_index < num_chunks:
+        count = slab_chunks
+        if num_chunks is not None:
+            count = min(count, num_chunks - chunk_index)
+
         # Handle frequency as either a fixed value or a function
         if callable(frequency):
-            freq = frequency(chunk_index)
-        else:
-            freq = frequency
+            omega = two_pi * frequency(chunk_index)
 
-        # Generate chunk with phase continuity
-        chunk, phase_offset = generate_sine_chunk(
-            freq, chunk_duration, sample_rate, amplitude, phase_offset
-        )
+        # Phase of each chunk, advanced by chunk_duration for continuity
+        phases = np.empty((count, 1))
+        for row in range(count):
+            phases[row] = phase_offset
+            phase_offset = (phase_offset + omega * chunk_duration) % two_pi
 
-        yield chunk
-        chunk_index += 1
+        # Generate the chunks, one row each
+        slab = scale_samples(sin(omega * t_chunk + phases), amplitude, output_dtype)
+        yield from slab
+        chunk_index += count
 
 
 def save_chunked_wav(filename, chunks_generator, sample_rate=44100):
@@ -88,35 +186,46 @@ def save_chunked_wav(filename, chunks_generator, sample_rate=44100):
 
     Args:
         filename (str): Output WAV filename
-        chunks_generator (generator): Generator yielding audio sample chunks
+        chunks_generator (generator): Generator yielding audio sample chunks,
+                                      either floats or 16-bit PCM
         sample_rate (int): Sample rate in Hz
     """
-    # Open WAV file
-    with wave.open(filename, "w") as wav_file:
+    # Open WAV file through a 1 MiB buffer so small chunk writes are coalesced
+    with open(filename, "wb", buffering=1 << 20) as raw_file, wave.open(
+        raw_file, "wb"
+    ) as wav_file:
         # Set parameters
         nchannels = 1  # Mono
         sampwidth = 2  # 16-bit
 
-        # Set initial WAV file parameters (we'll update frames later)
+        # Set WAV file parameters, the wave module patches the frame count
+        # into the header when the file is closed
         wav_file.setparams(
             (nchannels, sampwidth, sample_rate, 0, "NONE", "not compressed")
         )
 
-        total_samples = 0
+        # Scratch buffer for the 16-bit conversion, reused across chunks
+        scratch_i16 = np.empty(0, dtype=np.int16)
 
         # Write each chunk as it's generated
         for chunk in chunks_generator:
+            # Write every sample in order, whatever the chunk's shape
+            chunk = np.ravel(chunk)
+
+            # Already 16-bit PCM, write as is
+            if chunk.dtype == np.int16:
+                wav_file.writeframes(chunk.tobytes())
+                continue
+
+            if chunk.size != scratch_i16.size:
+                scratch_i16 = np.empty(chunk.size, dtype=np.int16)
+
             # Convert to 16-bit PCM
             max_amplitude = 32767  # Maximum amplitude for 16-bit audio
-            chunk_int = (chunk * max_amplitude).astype(np.int16)
+            _to_pcm(chunk, max_amplitude, scratch_i16)
 
             # Write chunk
-            wav_file.writeframes(chunk_int.tobytes())
-
-            total_samples += len(chunk)
-
-        # Update the number of frames in the file header
-        wav_file._nframes = total_samples
+            wav_file.writeframes(scratch_i16.tobytes())
 
 
 # Example 1: Generate a constant frequency tone in chunks
@@ -130,7 +239,9 @@ def example_constant_frequency():
     num_chunks = int(total_duration / chunk_duration)
 
     # Generate and save
-    chunks = sine_wave_chunk_generator(frequency, chunk_duration, num_chunks)
+    chunks = sine_wave_chunk_generator(
+        frequency, chunk_duration, num_chunks, output_dtype=np.int16
+    )
     save_chunked_wav("constant_tone.wav", chunks)
 
     print(f"Generated constant_tone.wav ({total_duration}s at {frequency}Hz)")
@@ -158,6 +269,7 @@ def example_frequency_sweep():
         freq_function,
         chunk_duration,
         num_chunks,
+        output_dtype=np.int16,
     )
     save_chunked_wav("frequency_sweep.wav", chunks)
 
@@ -176,7 +288,9 @@ def example_infinite_chunks():
 
     # For demonstration, we'll limit to 10 chunks
     # In a real streaming scenario, you would use a different stopping condition
-    chunks = sine_wave_chunk_generator(frequency, chunk_duration, num_chunks=10)
+    chunks = sine_wave_chunk_generator(
+        frequency, chunk_duration, num_chunks=10, output_dtype=np.int16
+    )
     save_chunked_wav("streamed_tone.wav", chunks)
 
     print(f"Generated streamed_tone.wav (streaming {frequency}Hz tone)")
@@ -5,6 +5,26 @@ Example:
 """
 
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Copies are I/O-bound, so use more threads than cores to overlap disk latency
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _iter_files(folder, suffix, recursive):
+    """Yields (path, filename) for files ending with suffix (case-insensitive),
+    descending into subdirectories but not symlinked ones if recursive."""
+
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and not entry.is_symlink():
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(suffix):
+                    yield entry.path, entry.name
 
 
 def flatten_directory_structure(input_folder, output_folder):
@@ -12,27 +32,34 @@ def flatten_directory_structure(input_folder, output_folder):
 
     os.makedirs(output_folder, exist_ok=True)
 
+    # Maps each output file path to the single file that is copied there
+    sources = {}
+
     # Iterate over all files in the input directory
-    for root, dirs, files in os.walk(input_folder):
-        for filename in files:
-            # Construct full file path
-            file_path = os.path.join(root, filename)
-
-            # Construct the new filename by concatenating directory names with underscores
-            relative_path = os.path.relpath(root, input_folder)
-            dir_names = os.path.normpath(relative_path).split(os.sep)
-            new_filename = "_".join(dir_names + [filename])
-
-            # Define the output file path
-            output_file_path = os.path.join(output_folder, new_filename)
-
-            # Copy the content to the new file path
-            with open(file_path, "rb") as src_file, open(
-                output_file_path, "wb"
-            ) as dest_file:
-                dest_file.write(src_file.read())
-
-            print(f"Flattened {file_path} to {output_file_path}")
+    for file_path, filename in _iter_files(input_folder, "", True):
+        # Construct the new filename by concatenating directory names with underscores
+        relative_path = os.path.relpath(os.path.dirname(file_path), input_folder)
+        if relative_path == os.curdir:
+            new_filename = filename
+        else:
+            new_filename = relative_path.replace(os.sep, "_") + "_" + filename
+
+        # Define the output file path
+        output_file_path = os.path.join(output_folder, new_filename)
+
+        # Different paths can flatten to the same name (a/b/c and a_b/c), keep
+        # the one that sorts last so no two workers write the same file
+        if output_file_path in sources:
+            kept, skipped = sorted([sources[output_file_path], file_path])[::-1]
+            print(f"Skipped {skipped}, {kept} also flattens to {output_file_path}")
+            file_path = kept
+        sources[output_file_path] = file_path
+
+    # Copy the content to the new file paths (kernel-side where supported)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(shutil.copyfile, sources.values(), sources.keys()))
+
+    print(f"Flattened {len(sources)} files from {input_folder} into {output_folder}")
 
 
 input_folder = input("Path to the folder to flatten: ").strip()
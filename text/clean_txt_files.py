@@ -1,40 +1,156 @@
+import io
+import mmap
 import os
 import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
+# File reads and writes are I/O-bound, so use more threads than cores
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-def clean_txt_files(input_folder, recursive=False):
-    """Cleans the content of text files by replacing triple or more new lines
-    with double new lines and removes Line Separator (LS) and Paragraph
-    Separator (PS) in all .txt files in the specified directory."""
+# Triple or more new lines, lines with only spaces or tabs count as empty
+MULTI_NEWLINE_PATTERN = re.compile(r"(?:\n[ \t]*){3,}")
+
+# Same pattern on raw bytes, for any newline style text mode would translate
+MULTI_NEWLINE_BYTES_PATTERN = re.compile(rb"(?:(?:\r\n?|\n)[ \t]*){3,}")
+
+# UTF-8 encodings of Line Separator (LS) and Paragraph Separator (PS)
+SEPARATOR_BYTES = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")
+
+# Translation table removing Line Separator (LS) and Paragraph Separator (PS)
+SEPARATOR_TABLE = str.maketrans("", "", "\u2028\u2029")
+
+# Files larger than this are cleaned block by block instead of all at once
+STREAMING_THRESHOLD = 8 << 20
+STREAMING_BLOCK_SIZE = 1 << 20
+
+
+def _iter_files(folder, suffix, recursive):
+    """Yields (path, filename) for files ending with suffix (case-insensitive),
+    descending into subdirectories but not symlinked ones if recursive."""
+
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and not entry.is_symlink():
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(suffix):
+                    yield entry.path, entry.name
+
+
+def _needs_cleaning(data):
+    """Checks raw file bytes (bytes or mmap) for anything the cleanup would
+    change, without decoding them."""
+
+    return (
+        any(data.find(separator) != -1 for separator in SEPARATOR_BYTES)
+        or MULTI_NEWLINE_BYTES_PATTERN.search(data) is not None
+    )
+
+
+def _clean_content(content):
+    """Cleans a piece of text content."""
+
+    # Replace triple or more new lines with double new lines
+    content = MULTI_NEWLINE_PATTERN.sub("\n\n", content)
+
+    # Remove Line Separator (LS) and Paragraph Separator (PS)
+    return content.translate(SEPARATOR_TABLE)
 
-    # Iterate over all files in the input directory
-    for root, dirs, files in os.walk(input_folder):
-        for filename in files:
-            if not filename.endswith(".txt"):
-                continue
 
-            # Construct full file path
-            file_path = os.path.join(root, filename)
+def _clean_large_txt_file(file_path):
+    """Cleans a large .txt file block by block through a temporary file, so
+    only one block is held in memory at a time."""
 
-            # Read the content of the .txt file
-            with open(file_path, "r", encoding="utf-8") as txt_file:
-                content = txt_file.read()
+    fd, temp_path = tempfile.mkstemp(
+        suffix=".tmp", dir=os.path.dirname(file_path) or "."
+    )
+    try:
+        # Wrap the descriptor first so it is closed even if the source fails
+        # to open
+        with open(fd, "w", encoding="utf-8") as temp_file, open(
+            file_path, "r", encoding="utf-8"
+        ) as txt_file:
+            carry = ""
+            while block := txt_file.read(STREAMING_BLOCK_SIZE):
+                block = carry + block
 
-            # Replace triple or more new lines with double new lines
-            # Consider lines with only a space as empty lines
-            content = re.sub(r"(?:\n[ \t]*){3,}", "\n\n", content)
+                # Hold back trailing whitespace so a run of empty lines is
+                # never split between two blocks
+                head = block.rstrip("\n \t")
+                carry = block[len(head) :]
 
-            # Remove Line Separator (LS) and Paragraph Separator (PS)
-            content = content.replace("\u2028", "").replace("\u2029", "")
+                temp_file.write(_clean_content(head))
+
+            temp_file.write(_clean_content(carry))
+
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _clean_txt_file(file_path):
+    """Cleans the content of a single .txt file in place. Returns False if the
+    file was already clean and left untouched."""
+
+    # Read the raw content of the .txt file once, large files are only
+    # scanned through mmap and cleaned block by block if needed
+    with open(file_path, "rb") as txt_file:
+        size = os.fstat(txt_file.fileno()).st_size
+        if size == 0:
+            return False
+
+        if size > STREAMING_THRESHOLD:
+            with mmap.mmap(txt_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if not _needs_cleaning(data):
+                    return False
+            raw = None
+        else:
+            raw = txt_file.read()
+            if not _needs_cleaning(raw):
+                return False
+
+    if raw is None:
+        _clean_large_txt_file(file_path)
+        return True
+
+    # Decode the same bytes, translating newlines like a text mode read would.
+    # The UTF-8 decoder already has an ASCII fast path, so this beats a
+    # separate bytes.decode("ascii") plus newline replaces even on ASCII files.
+    content = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8").read()
+
+    content = _clean_content(content)
+
+    # Write the modified content back to the .txt file
+    with open(file_path, "w", encoding="utf-8") as txt_file:
+        txt_file.write(content)
+
+    return True
+
+
+def clean_txt_files(input_folder, recursive=False):
+    """Cleans the content of text files by replacing triple or more new lines
+    with double new lines and removes Line Separator (LS) and Paragraph
+    Separator (PS) in all .txt files in the specified directory."""
 
-            # Write the modified content back to the .txt file
-            with open(file_path, "w", encoding="utf-8") as txt_file:
-                txt_file.write(content)
+    # Collect all .txt files in the input directory
+    file_paths = [
+        file_path for file_path, _ in _iter_files(input_folder, ".txt", recursive)
+    ]
 
-            print(f"Processed {filename} in {file_path}")
+    # Clean the files concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        num_cleaned = sum(executor.map(_clean_txt_file, file_paths))
 
-        if not recursive:
-            break
+    print(
+        f"Processed {num_cleaned} .txt files in {input_folder}, "
+        f"skipped {len(file_paths) - num_cleaned} already clean"
+    )
 
 
 input_folder = input("Path to the folder containing .txt files: ").strip()
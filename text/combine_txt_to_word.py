@@ -12,15 +12,18 @@ from docx import Document
 from docx.enum.section import WD_ORIENTATION
 
 
-def create_word_document(source_directory: str, output_file: str):
+def create_word_document(source_directory: str, output_file: str) -> int:
     document = Document()
     section = document.sections[0]
     section.orientation = WD_ORIENTATION.PORTRAIT
 
-    for filename in os.listdir(source_directory):
-        if not filename.endswith(".txt"):
-            continue
+    filenames = [
+        filename
+        for filename in os.listdir(source_directory)
+        if filename.endswith(".txt")
+    ]
 
+    for filename in filenames:
         document.add_page_break()
         document.add_heading(filename, level=1)
 
@@ -28,14 +31,19 @@ def create_word_document(source_directory: str, output_file: str):
             os.path.join(source_directory, filename), "r", encoding="utf-8"
         ) as file:
             content = file.read()
-            document.add_paragraph(content, style="Normal")
+
+        # One paragraph per block of text keeps each <w:p> element small
+        for paragraph in content.split("\n\n"):
+            document.add_paragraph(paragraph, style="Normal")
 
     document.save(output_file)
 
+    return len(filenames)
+
 
 directory = input("Path to the folder containing .txt files: ").strip()
 output_file = input("Name of the output .docx file: ").strip()
 
-create_word_document(directory, output_file)
+num_files = create_word_document(directory, output_file)
 
-print(f"Combined {len(os.listdir(directory))} .txt files into {output_file}")
+print(f"Combined {num_files} .txt files into {output_file}")
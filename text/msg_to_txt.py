@@ -5,47 +5,84 @@ extract-msg==0.54.0
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 import extract_msg
 
+# Parsing and writing are mostly I/O-bound, so use more threads than cores
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Characters encoded and written per slice of a message body
+WRITE_BLOCK_SIZE = 1 << 20
+
+
+def _iter_files(folder, suffix, recursive):
+    """Yields (path, filename) for files ending with suffix (case-insensitive),
+    descending into subdirectories but not symlinked ones if recursive."""
+
+    stack = [folder]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and not entry.is_symlink():
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith(suffix):
+                    yield entry.path, entry.name
+
+
+def _convert_msg_file(file_path, output_file_path):
+    """Converts a single .msg file to a .txt file."""
+
+    # Extract the content of the .msg file, releasing its OLE streams as
+    # soon as we're done instead of waiting for garbage collection
+    msg = extract_msg.Message(file_path)
+    try:
+        msg_text = msg.body
+    finally:
+        msg.close()
+
+    # Write the content to a .txt file in fixed-size slices, so only one
+    # slice at a time is encoded instead of a second copy of the whole body
+    with open(output_file_path, "w", encoding="utf-8", buffering=1 << 20) as txt_file:
+        for start in range(0, len(msg_text), WRITE_BLOCK_SIZE):
+            txt_file.write(msg_text[start : start + WRITE_BLOCK_SIZE])
+
 
 def msg_to_txt(input_folder, output_folder, recursive=False):
     """Converts .msg files to .txt files in bulk."""
 
     os.makedirs(output_folder, exist_ok=True)
 
-    # Iterate over all files in the input directory
-    for root, dirs, files in os.walk(input_folder):
-        for filename in files:
-            if not filename.endswith(".msg"):
-                continue
-
-            # Construct full file path
-            file_path = os.path.join(root, filename)
+    # Maps each output file path to the single .msg file converted into it
+    sources = {}
 
-            # Extract the content of the .msg file
-            msg = extract_msg.Message(file_path)
-            msg_text = msg.body
+    # Iterate over all .msg files in the input directory
+    for file_path, filename in _iter_files(input_folder, ".msg", recursive):
+        # Define the output file path, swapping only the .msg suffix
+        txt_filename = os.path.splitext(filename)[0] + ".txt"
+        if recursive:
+            relative_path = os.path.relpath(os.path.dirname(file_path), input_folder)
+            output_dir_path = os.path.join(output_folder, relative_path)
+            output_file_path = os.path.join(output_dir_path, txt_filename)
 
-            # Define the output file path
-            if recursive:
-                relative_path = os.path.relpath(root, input_folder)
-                output_dir_path = os.path.join(output_folder, relative_path)
-                output_file_path = os.path.join(
-                    output_dir_path, filename.replace(".msg", ".txt")
-                )
+            os.makedirs(output_dir_path, exist_ok=True)
 
-                os.makedirs(output_dir_path, exist_ok=True)
+        else:
+            output_file_path = os.path.join(output_folder, txt_filename)
 
-            else:
-                output_file_path = os.path.join(
-                    output_folder, filename.replace(".msg", ".txt")
-                )
+        # Names differing only in suffix case (a.msg, a.MSG) map to the same
+        # output, keep the one that sorts last so no two workers write it
+        if output_file_path in sources:
+            kept, skipped = sorted([sources[output_file_path], file_path])[::-1]
+            print(f"Skipped {skipped}, {kept} also converts to {output_file_path}")
+            file_path = kept
+        sources[output_file_path] = file_path
 
-            # Write the content to a .txt file
-            with open(output_file_path, "w", encoding="utf-8") as txt_file:
-                txt_file.write(msg_text)
+    # Convert the files concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(_convert_msg_file, sources.values(), sources.keys()))
 
-            print(f"Converted {filename} to {output_file_path}")
+    print(f"Converted {len(sources)} .msg files to {output_folder}")
 
 
 input_folder = input("Path to the folder containing .msg files: ").strip()